@@ -1,29 +1,103 @@
 import json
 import logging
-import random
-import string
+import mmap
 import os
+import secrets
+import threading
 import time
 from multiprocessing import Process
 
-import sc_runner.constants
 from sc_runner.runner import run_calculation
 from sc_runner.monitor import monitor_job
-from sc_runner.constants import LOG_FILE, output_file_path, backend_url
+from sc_runner.signal_sender import send_update
+from sc_runner.constants import LOG_FILE, REQUEST_INTERVAL, output_file_path, backend_url
 from sc_runner.analyse.analyse_results import Analysis
+from sc_runner.logging_setup import setup_logging
 from sc_runner.types import ProjectType
-from sc_runner.monitor import send_update
-from sc_runner.constants import REQUEST_INTERVAL
+from sc_runner.utils import read_json_cached
 
 
 PARAMETERS_JSON = 'parameters.json'
+JOB_COMPLETED = b'Job completed'
 
 
 def generate_random_token(length=12):
     """
     Generate a random token of the given length.
     """
-    return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
+    return secrets.token_urlsafe(length)[:length]
+
+
+def wait_for_output(output_, timeout=5.0, interval=0.05):
+    """
+    Wait until the output file stops growing, for at most `timeout` seconds.
+
+    Args:
+        output_ (str): Path to the `siesta.out` file.
+        timeout (float): Maximum time to wait in seconds.
+        interval (float): Time between two size checks in seconds.
+    """
+    deadline = time.monotonic() + timeout
+    last_size = None
+    while time.monotonic() < deadline:
+        try:
+            size = os.stat(output_).st_size
+        except FileNotFoundError:
+            size = None
+        if size == last_size:
+            return
+        last_size = size
+        time.sleep(interval)
+
+
+def _check_trajectory(output_):
+    """
+    Check that the geometry optimization wrote a non-empty trajectory file.
+    """
+    traj_file = "geometry_optimization.traj"  # Replace with actual path if needed
+    try:
+        traj_found = os.stat(traj_file).st_size > 0
+    except FileNotFoundError:
+        traj_found = False
+    if traj_found:
+        logging.info("Optimization job completed successfully. Trajectory file found.")
+        return True
+    else:
+        logging.warning("Optimization job did not complete successfully. Trajectory file is missing or empty.")
+        return False
+
+
+def _check_output_tail(output_):
+    """
+    Check that the last meaningful line of `siesta.out` is 'Job completed'.
+    """
+    # Walk the mapped file backwards line by line and stop at the first non-empty one
+    completed = False
+    with open(output_, 'rb') as f:
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                end = len(mm)
+                while end > 0:
+                    start = mm.rfind(b'\n', 0, end) + 1
+                    line = mm[start:end].strip()
+                    if line:
+                        completed = line == JOB_COMPLETED
+                        break
+                    end = start - 1
+    if completed:
+        return True
+    else:
+        logging.warning(
+            "SIESTA job did not complete successfully. "
+            "No 'Job completed' message found in the last meaningful line.")
+        return False
+
+
+_COMPLETION_CHECKERS = {
+    ProjectType.SINGLE_POINT: _check_output_tail,
+    ProjectType.MD: _check_output_tail,
+    ProjectType.GEOMETRY_OPTIMIZATION: _check_trajectory,
+}
 
 
 def check_siesta_completion(output_, project_type):
@@ -38,24 +112,7 @@ def check_siesta_completion(output_, project_type):
         bool: True if the job is complete, False otherwise.
     """
     try:
-        if project_type == ProjectType.GEOMETRY_OPTIMIZATION:
-            traj_file = "geometry_optimization.traj"  # Replace with actual path if needed
-            if os.path.exists(traj_file) and os.path.getsize(traj_file) > 0:
-                logging.info("Optimization job completed successfully. Trajectory file found.")
-                return True
-            else:
-                logging.warning("Optimization job did not complete successfully. Trajectory file is missing or empty.")
-                return False
-        else:
-            with open(output_, 'r') as f:
-                lines = [line.strip() for line in f if line.strip()]
-                if lines and lines[-1] == "Job completed":
-                    return True
-                else:
-                    logging.warning(
-                        "SIESTA job did not complete successfully. "
-                        "No 'Job completed' message found in the last meaningful line.")
-                    return False
+        return _COMPLETION_CHECKERS.get(project_type, _check_output_tail)(output_)
     except FileNotFoundError:
         logging.error(f"Output file {output_} not found.")
         return False
@@ -75,8 +132,7 @@ def load_parameters(file_path):
         dict: Parsed parameters dictionary.
     """
     try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
+        return read_json_cached(file_path)
     except FileNotFoundError:
         logging.error(f"Parameters file {file_path} not found.")
         raise
@@ -89,6 +145,9 @@ def main():
     """
     Main function to coordinate calculation, monitoring, and analysis.
     """
+    # Set up logging before any process is started so children share the listener
+    setup_logging(LOG_FILE)
+
     # Read token and project ID from environment variables
     project_id = os.getenv('PROJECT_ID', 63)
     token = os.getenv('TOKEN', 'absjhagkggdkfg')
@@ -113,38 +172,55 @@ def main():
         logging.error(f"Error loading or parsing parameters.json: {e}. Defaulting to 'single_point'.")
         project_type = ProjectType.SINGLE_POINT
 
-    # Set up logging
-    logging.basicConfig(filename=LOG_FILE, level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
-    # Set up processes for calculation and monitoring
+    # The calculation gets its own process; the monitor only polls a file and posts updates,
+    # so it runs in a thread and is stopped cooperatively through the event
     job_process = Process(target=run_calculation, args=(project_type,))
-    monitor_process = Process(target=monitor_job, args=(output_file_path, project_id, token, backend_url))
+    stop_event = threading.Event()
+    update_sent = threading.Event()
+    monitor_thread = threading.Thread(
+        target=monitor_job,
+        args=(project_id, token, stop_event, update_sent),
+        daemon=True,
+    )
 
     try:
-        # Start processes
+        # Start the job, then the monitor
         logging.info(f"Starting job process with project type: {project_type}.")
         job_process.start()
-        logging.info("Starting monitor process.")
-        monitor_process.start()
+        logging.info("Starting monitor thread.")
+        monitor_thread.start()
 
         # Wait for job completion
         job_process.join()
-        time.sleep(2)
-        monitor_process.terminate()
+        if job_process.exitcode:
+            logging.error(f"Job process exited with code {job_process.exitcode}.")
+        wait_for_output(output_file_path)
+        stop_event.set()
+        monitor_thread.join(timeout=2)
 
         # Check if the job completed successfully
         if check_siesta_completion(output_file_path, project_type):
             logging.info("Job completed successfully. Starting analysis.")
             Analysis(project_type=project_type).perform_analysis()
             logging.info("Sending final update after job completion.")
-            time.sleep(REQUEST_INTERVAL)
-            send_update(project_id, status='completed', token=token, backend_url=backend_url)
+            # No need to wait out a full interval if the monitor's last update already went through
+            update_sent.wait(timeout=REQUEST_INTERVAL)
+            send_update(project_id, status='completed', token=token, backend_url=backend_url).result()
         else:
             logging.error("Analysis skipped due to incomplete job.")
     except Exception as e:
         logging.error(f"Error during job or monitoring processes: {e}")
     finally:
-        # Ensure monitor process is terminated
-        logging.info("Terminating monitor process.")
+        # Ensure the job process is reaped (e.g. on Ctrl-C) and the monitor thread is stopped
+        if job_process.is_alive():
+            logging.info("Terminating job process.")
+            job_process.terminate()
+            job_process.join(2)
+            if job_process.is_alive():
+                job_process.kill()
+                job_process.join()
+        logging.info("Stopping monitor thread.")
+        stop_event.set()
 
 
 if __name__ == "__main__":
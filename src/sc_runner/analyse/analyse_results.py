@@ -1,5 +1,6 @@
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from sc_runner.constants import (
     CALC_RESULT_JSON,
     GENERAL_INFO_JSON,
@@ -7,27 +8,32 @@ from sc_runner.constants import (
     RHO_GRID,
     SIESTA_OUT,
 )
-from sc_runner.analyse.single_point.dos import process_dos_file
-from sc_runner.analyse.single_point.netcdf_to_json import nc_parser
-from sc_runner.analyse.single_point.band_plotly_json import plot_band_go
-from sc_runner.analyse.single_point.siesta_output_parser import extract_selected_results
+from sc_runner.logging_setup import setup_logging
 from sc_runner.types import ProjectType
-from sc_runner.analyse.analyse_trajectory import TrajectoryAnalysis
-from sc_runner.analyse.single_point.pdos import PdosAnalyse
 
 
-def setup_logging(log_file: str = "task_log.log", level: int = logging.INFO) -> None:
-    """Sets up the logging configuration.
+def prefetch_files(*paths: str) -> None:
+    """Asks the kernel to start reading files into the page cache.
+
+    The call returns immediately, so later reads by the analysis tasks are served from
+    memory. Missing files and platforms without ``posix_fadvise`` are skipped.
 
     Args:
-        log_file (str): The file to which logs will be written.
-        level (int): The logging level.
+        paths (str): The files to prefetch.
     """
-    logging.basicConfig(
-        level=level,
-        format="%(asctime)s - %(levelname)s - %(message)s",
-        handlers=[logging.FileHandler(log_file), logging.StreamHandler()],
-    )
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
 
 
 class Analysis:
@@ -42,23 +48,30 @@ class Analysis:
         Raises:
             ValueError: If the project_type is unknown.
         """
+        if not isinstance(project_type, ProjectType):
+            raise ValueError(f"Unknown project type: {project_type}")
         self.project_type = project_type
-        if self.project_type not in ProjectType:
-            raise ValueError(f"Unknown project type: {self.project_type}")
+        self._dispatch = {
+            ProjectType.SINGLE_POINT: self._analyze_single_point,
+            ProjectType.MD: self._analyze_md,
+            ProjectType.GEOMETRY_OPTIMIZATION: self._analyze_relax,
+        }
         logging.info(f"Initialized Analysis with project type: {self.project_type.value}")
 
     def perform_analysis(self) -> None:
-        """Performs the analysis based on the project type."""
+        """Performs the analysis based on the project type.
+
+        Raises:
+            ValueError: If no analysis is registered for the project type.
+        """
+        handler = self._dispatch.get(self.project_type)
+        if handler is None:
+            raise ValueError(f"No analysis available for project type: {self.project_type.value}")
         logging.info(f"Starting analysis for project type: {self.project_type.value}")
         self._prepare()
 
         try:
-            if self.project_type == ProjectType.SINGLE_POINT:
-                self._analyze_single_point()
-            elif self.project_type == ProjectType.MD:
-                self._analyze_md()
-            elif self.project_type == ProjectType.GEOMETRY_OPTIMIZATION:
-                self._analyze_relax()
+            handler()
         except Exception as e:
             logging.error(f"Error during {self.project_type.value} analysis: {e}")
         finally:
@@ -74,8 +87,20 @@ class Analysis:
 
     def _analyze_single_point(self) -> None:
         """Performs SinglePoint-specific analysis."""
+        # Heavy dependencies (plotly, netCDF4) are only imported when this analysis runs
+        from sc_runner.analyse.single_point.band_plotly_json import plot_band_go
+        from sc_runner.analyse.single_point.dos import process_dos_file
+        from sc_runner.analyse.single_point.netcdf_to_json import nc_parser
+        from sc_runner.analyse.single_point.pdos import PdosAnalyse
+        from sc_runner.analyse.single_point.siesta_output_parser import extract_selected_results
+
         logging.info("Performing SinglePoint analysis...")
-        analyse_tasks = [
+        dos_file = "siesta.DOS"
+        pdos_file = "./siesta.PDOS.xml"  # Path to the PDOS file
+        prefetch_files(CALC_RESULT_JSON, SIESTA_OUT, dos_file, RHO_GRID, POTENTIAL_GRID, pdos_file)
+
+        # The remaining tasks read the general info written by this one
+        self._run_tasks([
             (
                 extract_selected_results,
                 {
@@ -84,31 +109,49 @@ class Analysis:
                     "output_json_path": GENERAL_INFO_JSON,
                 },
             ),
-            (plot_band_go, {}),
-            (process_dos_file, {"dos_filename": "siesta.DOS"}),
-            (nc_parser, {"grid_nc_file": RHO_GRID}),
-            (nc_parser, {"grid_nc_file": POTENTIAL_GRID}),
+        ])
+        # Independent tasks run concurrently; each inner list runs sequentially in one thread.
+        # netCDF4/HDF5 is not thread-safe, so both grid files are parsed by the same worker.
+        analyse_tasks = [
+            [(plot_band_go, {})],
+            [(process_dos_file, {"dos_filename": dos_file})],
+            [(nc_parser, {"grid_nc_file": RHO_GRID}), (nc_parser, {"grid_nc_file": POTENTIAL_GRID})],
         ]
-        for func, kwargs in analyse_tasks:
-            try:
-                func(**kwargs)  # type: ignore
-                logging.info(f"Task {func.__name__} completed successfully.")
-            except Exception as e:
-                logging.error(f"Error in SinglePoint analysis task {func.__name__}: {e}")
+        with ThreadPoolExecutor(max_workers=len(analyse_tasks)) as executor:
+            futures = [executor.submit(self._run_tasks, tasks) for tasks in analyse_tasks]
+            for future in as_completed(futures):
+                future.result()
 
         # Add PDOS analysis
         try:
-            pdos_file = "./siesta.PDOS.xml"  # Path to the PDOS file
             pdos_output = "./pdos_data.json"  # Output path for PDOS JSON
-            if os.path.exists(pdos_file):
+            try:
+                pdos_found = os.stat(pdos_file).st_size > 0
+            except FileNotFoundError:
+                pdos_found = False
+            if pdos_found:
                 pdos_analyser = PdosAnalyse(pdos_file)
                 pdos_analyser.write_json(pdos_output)
                 logging.info(f"PDOS analysis completed and data written to {pdos_output}.")
             else:
-                logging.warning(f"PDOS file {pdos_file} not found. Skipping PDOS analysis.")
+                logging.warning(f"PDOS file {pdos_file} not found or empty. Skipping PDOS analysis.")
         except Exception as e:
             logging.error(f"Error during PDOS analysis: {e}")
 
+    @staticmethod
+    def _run_tasks(tasks) -> None:
+        """Runs SinglePoint analysis tasks in order, logging failures without stopping.
+
+        Args:
+            tasks (list): Pairs of task function and keyword arguments.
+        """
+        for func, kwargs in tasks:
+            try:
+                func(**kwargs)  # type: ignore
+                logging.info(f"Task {func.__name__} completed successfully.")
+            except Exception as e:
+                logging.error(f"Error in SinglePoint analysis task {func.__name__}: {e}")
+
     def _analyze_md(self) -> None:
         """Performs MD-specific analysis."""
         logging.info("Performing MD analysis...")
@@ -121,6 +164,8 @@ class Analysis:
 
     def _analyze_relax(self) -> None:
         """Performs Relax-specific (geometry optimization) analysis."""
+        from sc_runner.analyse.analyse_trajectory import TrajectoryAnalysis
+
         logging.info("Performing Relax (geometry optimization) analysis...")
         try:
             trajectory_file = "geometry_optimization.traj"
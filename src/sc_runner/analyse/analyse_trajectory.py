@@ -1,13 +1,19 @@
 import os
-import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+
 import numpy as np
 from ase.io.trajectory import Trajectory
 import logging
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+from sc_runner.logging_setup import setup_logging
+from sc_runner.utils import write_json_atomic
 
 
 class TrajectoryAnalysis:
+    # Steps read by one worker; shorter trajectories are read in a single pass
+    frames_per_worker = 64
+
     def __init__(self, trajectory_file: str = 'geometry_optimization.traj'):
         """
         Initialize the trajectory analysis module.
@@ -20,6 +26,45 @@ class TrajectoryAnalysis:
             raise FileNotFoundError(f"Trajectory file '{self.trajectory_file}' not found.")
         self.traj = Trajectory(self.trajectory_file)
 
+    @cached_property
+    def _frames(self):
+        """
+        Read energies, forces and positions of every step.
+
+        Long trajectories are split into contiguous ranges of steps that are read
+        concurrently, each through its own trajectory handle.
+
+        Returns:
+            tuple: Energies (steps,), forces (steps, atoms, 3) and positions (steps, atoms, 3).
+        """
+        logging.info("Reading energies, forces and positions from trajectory.")
+        n_steps = len(self.traj)
+        n_atoms = len(self.traj[0]) if n_steps else 0
+        energies = np.empty(n_steps)
+        forces = np.empty((n_steps, n_atoms, 3))
+        positions = np.empty((n_steps, n_atoms, 3))
+
+        def read_steps(start, stop):
+            with Trajectory(self.trajectory_file) as traj:
+                for i in range(start, stop):
+                    atoms = traj[i]
+                    energies[i] = atoms.get_potential_energy()
+                    forces[i] = atoms.get_forces()
+                    positions[i] = atoms.get_positions()
+
+        bounds = range(0, n_steps, self.frames_per_worker)
+        if len(bounds) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(bounds), os.cpu_count() or 1)) as executor:
+                futures = [
+                    executor.submit(read_steps, start, min(start + self.frames_per_worker, n_steps))
+                    for start in bounds
+                ]
+                for future in futures:
+                    future.result()
+        else:
+            read_steps(0, n_steps)
+        return energies, forces, positions
+
     def extract_energies(self):
         """
         Extract potential energies for each step in the trajectory.
@@ -28,7 +73,7 @@ class TrajectoryAnalysis:
             list: List of potential energies.
         """
         logging.info("Extracting potential energies from trajectory.")
-        return [atoms.get_potential_energy() for atoms in self.traj]
+        return self._frames[0].tolist()
 
     def extract_forces(self):
         """
@@ -38,7 +83,8 @@ class TrajectoryAnalysis:
             list: List of force magnitudes.
         """
         logging.info("Extracting forces from trajectory.")
-        return [np.linalg.norm(np.sum(atoms.get_forces(), axis=0)) for atoms in self.traj]
+        # (steps, atoms, 3) -> net force per step -> its magnitude
+        return np.linalg.norm(self._frames[1].sum(axis=1), axis=1).tolist()
 
     def extract_positions(self):
         """
@@ -48,7 +94,7 @@ class TrajectoryAnalysis:
             list: List of atomic positions as 2D arrays for each step.
         """
         logging.info("Extracting atomic positions from trajectory.")
-        return [atoms.get_positions().tolist() for atoms in self.traj]
+        return self._frames[2].tolist()
 
     def extract_step_data(self):
         """
@@ -69,7 +115,7 @@ class TrajectoryAnalysis:
                     "force_magnitude": forces[i],
                     "positions": positions[i],
                 }
-                for i in range(len(self.traj))
+                for i in range(len(energies))
             ]
         }
 
@@ -84,8 +130,7 @@ class TrajectoryAnalysis:
         """
         logging.info("Saving trajectory analysis data to JSON.")
         data = self.extract_step_data()
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+        write_json_atomic(output_file, data)
         logging.info(f"Data saved to {output_file}")
 
 
@@ -93,6 +138,7 @@ class TrajectoryAnalysis:
 if __name__ == "__main__":
     trajectory_file = "geometry_optimization.traj"  # Update this to your trajectory file path
     output_json_file = "trajectory_analysis.json"  # JSON output path
+    setup_logging()
 
     try:
         analysis = TrajectoryAnalysis(trajectory_file)
@@ -1,7 +1,5 @@
 """."""
 
-import json
-from pathlib import Path
 from typing import Any, Dict
 
 import numpy as np  # type: ignore
@@ -13,6 +11,7 @@ from sc_runner.constants import (  # type: ignore
     GENERAL_INFO_JSON,
     SIESTA_OUT,
 )
+from sc_runner.utils import ndarray_from_json, read_json_cached
 
 
 color_pallete = [
@@ -45,29 +44,24 @@ def result_2_dict() -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: Dictionary containing necessary data for plotting the band structure.
     """
-    band_dict = json.loads(Path(CALC_RESULT_JSON).read_text())['bandstructure']
+    band_dict = read_json_cached(CALC_RESULT_JSON)['bandstructure']
 
-    data_shape = band_dict['energies']['__ndarray__'][0]
-    n_spin, n_k, n_bands = data_shape
     ef = band_dict['reference']
-    temp_matrix = band_dict['energies']['__ndarray__'][2]
-    temp_arr = np.array(temp_matrix) - ef
-    bandmat = temp_arr.reshape(data_shape)
+    bandmat = ndarray_from_json(band_dict['energies']) - ef
+    n_spin, n_k, n_bands = bandmat.shape
     path_data = band_dict['path']
     special_points = path_data['special_points']
-    temp_k_matrix = path_data['kpts']['__ndarray__']
-    # k_shape = temp_k_matrix[0]
-    k_temp = temp_k_matrix[2]
-    k_vectors_list = [k_temp[x : x + 3] for x in range(0, len(k_temp), 3)]
-    k_vectors = np.array(k_vectors_list)
-    ind_label = []
-
-    for sp in list(special_points.keys()):
-        for ik in range(len(k_vectors)):
-            if k_vectors_list[ik] == special_points[sp]['__ndarray__'][2]:
-                ind_label.append((ik, sp))
-
-    ind_lb_sorted = sorted(ind_label, key=lambda x: x[0])
+    k_vectors = ndarray_from_json(path_data['kpts']).reshape(-1, 3)
+    # Map special point coordinates to labels so each k-point is matched with one lookup
+    special_k_labels = {tuple(special_points[sp]['__ndarray__'][2]): sp for sp in special_points}
+    ind_lb_sorted = []
+
+    # Walking the k-points in order keeps the matches sorted by index
+    for ik, k_vector in enumerate(map(tuple, k_vectors.tolist())):
+        label = special_k_labels.get(k_vector)
+        if label is not None:
+            ind_lb_sorted.append((ik, label))
+
     inds = [x[0] for x in ind_lb_sorted]
     mod_inds = [inds[0]]
 
@@ -76,17 +70,11 @@ def result_2_dict() -> Dict[str, Any]:
             mod_inds.append(inds[i])
 
     labelst = path_data['labelseq']
-    _jumploc = []
-
-    comma_count = 0
-
-    # Loop through the string to find indices
-    for i in range(1, len(labelst)):
-        if labelst[i] == ',':
-            # Adjust the index by the number of commas encountered so far
-            _jumploc.append(i - 1 - comma_count)
-            # Increment the comma count after adding the index
-            comma_count += 1
+    # Find the commas in one vectorized scan (a leading comma is not a jump)
+    comma_inds = np.flatnonzero(np.array(list(labelst), dtype='U1') == ',')
+    comma_inds = comma_inds[comma_inds > 0]
+    # Shift each index back by one and by the number of commas before it
+    _jumploc = (comma_inds - 1 - np.arange(len(comma_inds))).tolist()
 
     modified = [x for x in labelst if x != ',']
 
@@ -97,13 +85,12 @@ def result_2_dict() -> Dict[str, Any]:
     modified_labels = [x for x in modified if x != ' ']
     # n_mod_labels = len(labelst) - 2 * len(_jumploc)
     # index_list = [ind_lb_sorted[0][0]]
-    k_diff = k_vectors[1:, :] - k_vectors[: n_k - 1, :]
-    kline = np.zeros(n_k)
-
-    for ik in range(int(n_k - 1)):
-        abs_k_dif = np.linalg.norm(k_diff[ik])
-        k_plus = 0.0 if abs_k_dif > 0.2 else abs_k_dif
-        kline[ik + 1] = kline[ik] + k_plus
+    abs_k_diff = np.linalg.norm(np.diff(k_vectors, axis=0), axis=1)
+    # Jumps between disconnected path segments do not advance the k-line
+    abs_k_diff[abs_k_diff > 0.2] = 0.0
+    kline = np.empty(n_k)
+    kline[0] = 0.0
+    np.cumsum(abs_k_diff, out=kline[1:])
 
     klinev = np.reshape(kline, (n_k, 1))
     n_special_k_points = len(mod_inds)
@@ -189,14 +176,38 @@ def plot_band_go() -> None:
     elif spin == 2:
         spin_labels = [u'\u2191', u'\u2193']
 
+    # Bands without a legend entry that share a spin and color are drawn as one trace,
+    # with NaN points separating the bands, so the figure holds a handful of traces
+    # instead of one per band
+    x_segment = np.append(x_kpath, np.nan)
     for s in range(spin):
+        spin_bands = bandmat[s] - 0.0001 * s  # Small shift for visualization purposes
+        for i_color in range(5):
+            grouped = [i_band for i_band in range(i_color, n_band, 5) if not legends_stat[i_band]]
+            if not grouped:
+                continue
+            y_segments = np.full((len(grouped), len(x_segment)), np.nan)
+            y_segments[:, :-1] = spin_bands[:, grouped].T
+            graphs.append(
+                go.Scatter(
+                    x=np.tile(x_segment, len(grouped)),
+                    y=y_segments.ravel(),
+                    mode='lines',
+                    showlegend=False,
+                    line=dict(shape='linear', color=color_pallete[s][i_color], width=4 - 2 * s),
+                    name='bands' + spin_labels[s],
+                    yaxis='y1',
+                )
+            )
         for i_band in range(0, n_band):
+            if not legends_stat[i_band]:
+                continue
             graphs.append(
                 go.Scatter(
                     x=x_kpath,
-                    y=bandmat[s, :, i_band] - 0.0001 * s,  # Small shift for visualization purposes
+                    y=spin_bands[:, i_band],
                     mode='lines',
-                    showlegend=legends_stat[i_band],
+                    showlegend=True,
                     line=dict(shape='linear', color=color_pallete[s][i_band % 5], width=4 - 2 * s),
                     name='band_' + str(i_band + 1) + spin_labels[s],
                     yaxis='y1',
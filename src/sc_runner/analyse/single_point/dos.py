@@ -1,11 +1,31 @@
 """."""
 
 import json
-from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import numpy as np  # type: ignore
 from sc_runner.constants import CALC_RESULT_JSON
+from sc_runner.utils import read_json_cached
+
+
+def cumulative_trapezoid(y: np.ndarray, dx: float) -> np.ndarray:
+    """Cumulatively integrates samples along the last axis using the trapezoidal rule.
+
+    Args:
+        y (np.ndarray): Uniformly spaced samples; integrated along the last axis.
+        dx (float): Spacing between samples.
+
+    Returns:
+        np.ndarray: Running integrals with the same shape as `y`, starting at 0.
+    """
+    cumulative = np.empty_like(y, dtype=np.float64)
+    cumulative[..., 0] = 0.0
+    # Trapezoid areas and their running sum are computed in the output buffer itself
+    areas = cumulative[..., 1:]
+    np.add(y[..., :-1], y[..., 1:], out=areas)
+    areas *= 0.5 * dx
+    np.cumsum(areas, axis=-1, out=areas)
+    return cumulative
 
 
 def process_dos_file(
@@ -15,14 +35,15 @@ def process_dos_file(
 
     The function processes the DOS data to calculate the total DOS, spin-up
     and spin-down DOS (if spin-polarized), the difference between spin-up and
-    spin-down DOS, and their respective integrals using the trapezoidal rule.
+    spin-down DOS, and their respective running (cumulative) and total integrals
+    using the trapezoidal rule.
 
     Args:
         dos_filename (str): Path to the DOS file.
         output_json_filename (str): Path where the output JSON will be saved. Defaults to 'DOS.json'.
         spin_polarized (bool): True if the DOS data is spin-polarized, False otherwise. Defaults to False.
     """
-    results = json.loads(Path(CALC_RESULT_JSON).read_text())
+    results = read_json_cached(CALC_RESULT_JSON)
     fermi_energy = results['fermi_energy']
     # Load data from the DOS file
     data = np.loadtxt(dos_filename)
@@ -34,29 +55,29 @@ def process_dos_file(
         # Extract spin-up and spin-down columns
         spin_up: np.ndarray = data[:, 1]
         spin_down: np.ndarray = data[:, 2]
-        # Calculate total DOS as the sum of spin-up and spin-down
-        total_dos: np.ndarray = spin_up + spin_down
-        # Calculate difference between spin-up and spin-down
-        difference: np.ndarray = spin_up - spin_down
-        # Calculate integrals using trapezoidal rule for more accuracy
-        cumulative_spin_up: List[float] = np.trapz(spin_up, dx=delta_E).tolist()
-        cumulative_spin_down: List[float] = np.trapz(spin_down, dx=delta_E).tolist()
-        cumulative_total_dos = np.trapz(total_dos, dx=delta_E).tolist()
-        cumulative_difference: List[float] = np.trapz(difference, dx=delta_E).tolist()
+        # Stack spin-up, spin-down, total (sum) and difference into one (4, n_energy) array
+        # so all four curves are integrated in a single call over contiguous memory
+        spin_dos: np.ndarray = np.stack((spin_up, spin_down, spin_up + spin_down, spin_up - spin_down))
+        # Calculate running integrals using trapezoidal rule; the last value is the total
+        cumulative: np.ndarray = cumulative_trapezoid(spin_dos, dx=delta_E)
+        integral_spin_up, integral_spin_down, integral_total_dos, integral_difference = cumulative[:, -1].tolist()
+        cumulative_spin_up, cumulative_spin_down, cumulative_total_dos, cumulative_difference = cumulative.tolist()
         # Convert arrays to lists for JSON serialization
-        spin_up = spin_up.tolist()
-        spin_down = spin_down.tolist()
-        total_dos = total_dos.tolist()
-        difference = difference.tolist()
+        spin_up, spin_down, total_dos, difference = spin_dos.tolist()
 
     else:
         # Non-spin-polarized case: only total DOS is present
         total_dos = data[:, 1]
-        # Calculate the integral for the non-polarized total DOS
-        cumulative_total_dos = np.trapz(total_dos, dx=delta_E).tolist()
+        # Calculate the running integral for the non-polarized total DOS
+        cumulative_total: np.ndarray = cumulative_trapezoid(total_dos, dx=delta_E)
+        integral_total_dos = float(cumulative_total[-1])
+        cumulative_total_dos = cumulative_total.tolist()
         # Set spin-up and spin-down related variables to empty lists
         spin_up, spin_down, difference = [], [], []
         cumulative_spin_up, cumulative_spin_down, cumulative_difference = [], [], []
+        integral_spin_up: Optional[float] = None
+        integral_spin_down: Optional[float] = None
+        integral_difference: Optional[float] = None
         # Convert total DOS to list for JSON serialization
         total_dos = total_dos.tolist()
     # Construct the JSON object
@@ -71,6 +92,10 @@ def process_dos_file(
         "cumulative_spin_down": cumulative_spin_down,
         "cumulative_total_dos": cumulative_total_dos,
         "cumulative_difference": cumulative_difference,
+        "integral_spin_up": integral_spin_up,
+        "integral_spin_down": integral_spin_down,
+        "integral_total_dos": integral_total_dos,
+        "integral_difference": integral_difference,
         "metadata": {
             "units": {"energy": "eV", "dos": "states/eV"},
             "spin_polarized": spin_polarized,
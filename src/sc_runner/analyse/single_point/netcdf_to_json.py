@@ -10,6 +10,50 @@ import numpy as np  # type: ignore
 
 from sc_runner.constants import GENERAL_INFO_JSON  # type: ignore
 
+# Arrays with more elements than this are encoded one sub-array at a time
+_JSON_CHUNK_SIZE = 1 << 16
+
+
+def _iter_json(value):
+    """Yields the JSON encoding of a value in pieces.
+
+    Large arrays are converted to lists and encoded one sub-array at a time, so only a
+    slice of the grid exists as Python floats at once. The output is identical to
+    `json.dumps(value.tolist())`.
+
+    Args:
+        value: A NumPy array or a JSON-serializable value.
+
+    Yields:
+        str: Consecutive pieces of the JSON text.
+    """
+    if isinstance(value, np.ndarray) and value.ndim > 1 and value.size > _JSON_CHUNK_SIZE:
+        yield '['
+        for i, sub_array in enumerate(value):
+            if i:
+                yield ', '
+            yield from _iter_json(sub_array)
+        yield ']'
+    else:
+        yield json.dumps(value.tolist() if isinstance(value, np.ndarray) else value)
+
+
+def _write_json(file_path: str, json_data: dict) -> None:
+    """Writes a dictionary that may hold large NumPy arrays to a JSON file.
+
+    Args:
+        file_path (str): Path to the JSON file.
+        json_data (dict): The data to write; arrays are serialized as nested lists.
+    """
+    with open(file_path, 'w') as json_file:
+        json_file.write('{')
+        for i, (key, value) in enumerate(json_data.items()):
+            if i:
+                json_file.write(', ')
+            json_file.write(f'{json.dumps(key)}: ')
+            json_file.writelines(_iter_json(value))
+        json_file.write('}')
+
 
 def nc_parser(grid_nc_file: str) -> None:
     """Parses a netCDF file containing grid data and write results to json.
@@ -29,19 +73,20 @@ def nc_parser(grid_nc_file: str) -> None:
         logging.error(f"File {grid_nc_file} does not exist.")
         return
 
-    dataset = nc.Dataset(grid_nc_file, mode='r')
-
     json_data = {}
-    for dim_name, dim in dataset.dimensions.items():
-        json_data[dim_name] = len(dim)
+    # Every variable is read from disk once; the arrays are reused below and only
+    # converted to lists while the JSON file is written
+    with nc.Dataset(grid_nc_file, mode='r') as dataset:
+        for dim_name, dim in dataset.dimensions.items():
+            json_data[dim_name] = len(dim)
 
-    for var_name in dataset.variables:
-        var_data = dataset.variables[var_name][:]
-        json_data[var_name] = var_data.tolist()
+        for var_name in dataset.variables:
+            json_data[var_name] = dataset.variables[var_name][:]
 
-    cell = dataset.variables['cell']
-    grid_data = dataset.variables['gridfunc']
-    n_spin, n1, n2, n3 = np.shape(grid_data)
+    cell = json_data['cell']
+    grid_data = json_data['gridfunc']
+    # SIESTA writes the grid in Fortran order, so the a axis is the last (fastest) one
+    n_spin, n3, n2, n1 = np.shape(grid_data)
 
     dot_ab = np.dot(cell[0], cell[1]).tolist()
     dot_ac = np.dot(cell[0], cell[2]).tolist()
@@ -57,9 +102,12 @@ def nc_parser(grid_nc_file: str) -> None:
     json_data['face_ac'] = float(face_ac)  # type: ignore
     json_data['face_bc'] = float(face_bc)  # type: ignore
 
-    diff_a = np.linalg.norm(cell[0]) / json_data['n1']
-    diff_b = np.linalg.norm(cell[1]) / json_data['n1']
-    diff_c = np.linalg.norm(cell[2]) / json_data['n3']
+    # Lengths of the a, b and c lattice vectors
+    cell_lengths = np.linalg.norm(np.asarray(cell), axis=1)
+
+    diff_a = cell_lengths[0] / json_data['n1']
+    diff_b = cell_lengths[1] / json_data['n2']
+    diff_c = cell_lengths[2] / json_data['n3']
 
     json_data['diff_a'] = float(diff_a)  # type: ignore
     json_data['diff_b'] = float(diff_b)  # type: ignore
@@ -71,13 +119,17 @@ def nc_parser(grid_nc_file: str) -> None:
         json_data['volume'] / (json_data['n1'] * json_data['n2'] * json_data['n3'])
     )  # type: ignore
 
-    json_data['a_grid'] = np.linspace(0, np.linalg.norm(cell[0]), n1 + 1)[:-1].tolist()
-    json_data['b_grid'] = np.linspace(0, np.linalg.norm(cell[1]), n2 + 1)[:-1].tolist()
-    json_data['c_grid'] = np.linspace(0, np.linalg.norm(cell[2]), n3 + 1)[:-1].tolist()
+    json_data['a_grid'] = np.linspace(0, cell_lengths[0], n1 + 1)[:-1].tolist()
+    json_data['b_grid'] = np.linspace(0, cell_lengths[1], n2 + 1)[:-1].tolist()
+    json_data['c_grid'] = np.linspace(0, cell_lengths[2], n3 + 1)[:-1].tolist()
     # TODO: extend for spin
-    a_average = 1.0 / (n2 * n3) * np.sum(grid_data[0], axis=(1, 2))
-    b_average = 1.0 / (n1 * n3) * np.sum(grid_data[0], axis=(0, 2))
-    c_average = 1.0 / (n1 * n2) * np.sum(grid_data[0], axis=(0, 1))
+    # Reduce the contiguous (fastest) a axis first; the b and c averages share the
+    # same partial sums, so the full grid is swept only twice
+    grid = np.ascontiguousarray(grid_data[0])
+    cb_sums = grid.sum(axis=2)
+    a_average = grid.sum(axis=(0, 1)) / (n2 * n3)
+    b_average = cb_sums.sum(axis=0) / (n1 * n3)
+    c_average = cb_sums.sum(axis=1) / (n1 * n2)
 
     json_data['a_average'] = a_average.tolist()
     json_data['b_average'] = b_average.tolist()
@@ -90,9 +142,9 @@ def nc_parser(grid_nc_file: str) -> None:
     if grid_nc_file == 'Rho.grid.nc':
         grid_total_charge = json_data['diff_volume'] * np.sum(grid_data)
         logging.info(f'total charge is  {grid_total_charge}')
-        Path('Rho_grid.json').write_text(json.dumps(json_data))
+        _write_json('Rho_grid.json', json_data)
     elif grid_nc_file == 'ElectrostaticPotential.grid.nc':
-        Path('ElectrostaticPotential_grid.json').write_text(json.dumps(json_data))
+        _write_json('ElectrostaticPotential_grid.json', json_data)
 
     return None
 
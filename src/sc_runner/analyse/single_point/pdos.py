@@ -1,43 +1,52 @@
 import os
-import json
 import xml.etree.ElementTree as ET
+from functools import cached_property
 import numpy as np
+from sc_runner.utils import write_json_atomic
 
 
 class PdosAnalyse:
     def __init__(self, pdosfile: str = './siesta.PDOS.xml') -> None:
         """
         Initialize the PdosAnalyse class.
+
+        Only the header elements before the first orbital are parsed here; orbitals are
+        streamed by `extract_orbital_data` so the full tree is never held in memory.
         """
         self._pdosfile = pdosfile
         self._pdospath, self._pdosfilename = os.path.split(self._pdosfile)
+        self._header = {}
         try:
-            tree = ET.parse(self._pdosfile)
-            self._root = tree.getroot()
+            with open(self._pdosfile, 'rb') as f:
+                for event, element in ET.iterparse(f, events=('start', 'end')):
+                    if element.tag == 'orbital':
+                        break
+                    if event == 'end':
+                        self._header[element.tag] = element
         except (FileNotFoundError, ET.ParseError):
             raise ValueError('Invalid PDOS file or file not found.')
 
-    @property
+    @cached_property
     def nspin(self) -> int:
         """
         Extract and cache the number of spins from the XML file.
         """
-        element = self._root.find('nspin')
+        element = self._header.get('nspin')
         if element is not None and element.text:
             return int(element.text.strip())
         raise ValueError('nspin not found or invalid in the XML file.')
 
-    def extract_numeric_array(self, text: str) -> list:
+    def extract_numeric_array(self, text: str) -> np.ndarray:
         """
-        Convert a string of space-separated numbers into a list of floats.
+        Convert a string of whitespace-separated numbers into an array of floats, parsed in C.
         """
-        return [float(x) for x in text.split()] if text else []
+        return np.fromstring(text, dtype=np.float64, sep=' ') if text else np.empty(0)
 
     def extract_single_value(self, tag: str) -> float:
         """
         Extract a single numerical value from a specific XML tag.
         """
-        element = self._root.find(tag)
+        element = self._header.get(tag)
         if element is not None and element.text:
             return float(element.text.strip())
         return None
@@ -46,7 +55,7 @@ class PdosAnalyse:
         """
         Extract text data from a specific XML tag.
         """
-        element = self._root.find(tag)
+        element = self._header.get(tag)
         return element.text.strip() if element is not None else None
 
     def extract_orbital_data(self) -> list:
@@ -54,19 +63,31 @@ class PdosAnalyse:
         Extract detailed orbital data, including numerical values.
         """
         orbitals = []
-        energy_values = self.extract_numeric_array(self._root.find('energy_values').text)
+        energy_values = self.extract_numeric_array(self._header['energy_values'].text)
         energy_count = len(energy_values)
+        expected_size = energy_count * self.nspin
 
-        for orbital in self._root.iter('orbital'):
-            attributes = orbital.attrib  # Orbital metadata (species, atom_index, etc.)
-            values = orbital[0].text if len(orbital) > 0 else ""  # Orbital numerical data
-            orbital_data = self.extract_numeric_array(values)
-
-            if len(orbital_data) != energy_count*self.nspin:
-                raise ValueError(f"Mismatch in energy grid and orbital data for {attributes}")
-
-            attributes['values'] = orbital_data  # Add numerical data to the attributes
-            orbitals.append(attributes)
+        try:
+            with open(self._pdosfile, 'rb') as f:
+                context = ET.iterparse(f, events=('start', 'end'))
+                _, root = next(context)
+                for event, orbital in context:
+                    if event != 'end' or orbital.tag != 'orbital':
+                        continue
+                    attributes = dict(orbital.attrib)  # Orbital metadata (species, atom_index, etc.)
+                    values = orbital[0].text if len(orbital) > 0 else ""  # Orbital numerical data
+                    orbital_data = self.extract_numeric_array(values)
+
+                    if orbital_data.size != expected_size:
+                        raise ValueError(f"Mismatch in energy grid and orbital data for {attributes}")
+
+                    attributes['values'] = orbital_data.tolist()  # Add numerical data to the attributes
+                    orbitals.append(attributes)
+                    # Release parsed orbitals so memory is bounded by a single orbital
+                    root.clear()
+        except (FileNotFoundError, ET.ParseError):
+            # The constructor only parses the header; the rest of the file is checked here
+            raise ValueError('Invalid PDOS file or file not found.')
 
         return orbitals
 
@@ -77,7 +98,7 @@ class PdosAnalyse:
         pdos_data = {
             "nspin": self.nspin,
             "fermi_energy": self.extract_single_value("fermi_energy"),
-            "energy_values": self.extract_numeric_array(self._root.find('energy_values').text),
+            "energy_values": self.extract_numeric_array(self._header['energy_values'].text).tolist(),
             "orbitals": self.extract_orbital_data(),
         }
         return pdos_data
@@ -87,8 +108,7 @@ class PdosAnalyse:
         Write the extracted PDOS data to a JSON file.
         """
         pdos_data = self.generate_json()
-        with open(output_file, "w", encoding="utf-8") as json_file:
-            json.dump(pdos_data, json_file, indent=4)
+        write_json_atomic(output_file, pdos_data)
         print(f"JSON file written to {output_file}")
 
 
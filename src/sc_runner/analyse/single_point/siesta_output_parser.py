@@ -1,10 +1,10 @@
 """."""
 
 
-import json
 import logging
 import math
-from pathlib import Path
+import mmap
+import os
 from typing import Dict, Optional
 
 from sc_runner.constants import (  # type: ignore
@@ -12,20 +12,25 @@ from sc_runner.constants import (  # type: ignore
     GENERAL_INFO_JSON,
     SIESTA_OUT,
 )
+from sc_runner.logging_setup import setup_logging
+from sc_runner.utils import read_json_cached, result_array_shape, write_json_atomic
 
 
-def setup_logging(log_file: str = "runner.log", level: int = logging.INFO) -> None:
-    """Sets up the logging configuration.
+def _line_at(buffer: mmap.mmap, position: int) -> str:
+    """Returns the full line of a buffer that contains the given byte position.
 
     Args:
-        log_file (str): The file to which logs will be written.
-        level (int): The logging level.
+        buffer (mmap.mmap): The mapped file.
+        position (int): A byte offset inside the line.
+
+    Returns:
+        str: The decoded line without its line terminator.
     """
-    logging.basicConfig(
-        level=level,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[logging.FileHandler(log_file), logging.StreamHandler()],
-    )
+    start = buffer.rfind(b'\n', 0, position) + 1
+    end = buffer.find(b'\n', position)
+    if end == -1:
+        end = len(buffer)
+    return buffer[start:end].decode()
 
 
 def extract_siesta_data(file_path: str) -> Dict[str, Optional[float]]:
@@ -42,14 +47,17 @@ def extract_siesta_data(file_path: str) -> Dict[str, Optional[float]]:
     last_tot_line = None
 
     try:
-        # Read the entire file content as a single string
-        content = Path(file_path).read_text()
-        # Iterate over each line in the file
-        for line in content.splitlines():
-            if 'Total number of electrons:' in line:
-                results['number_of_electrons'] = float(line.split()[-1])  # type: ignore
-            elif line.startswith('   Tot   '):
-                last_tot_line = line
+        # Map the file instead of reading it: the electron count is printed near the top
+        # and the last 'Tot' line near the end, so only those pages are actually read
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    position = buffer.find(b'Total number of electrons:')
+                    if position != -1:
+                        results['number_of_electrons'] = float(_line_at(buffer, position).split()[-1])  # type: ignore
+                    position = buffer.rfind(b'\n   Tot   ')
+                    if position != -1:
+                        last_tot_line = _line_at(buffer, position + 1)
         # If a 'Tot' line was found, compute the norm of the force
         if last_tot_line:
             try:
@@ -80,8 +88,8 @@ def extract_selected_results(
     """
     selected_results = {}
     try:
-        data = json.loads(Path(results_json_path).read_text())
-        n_spin, n_k, n_eig = data['eigenvalues']['__ndarray__'][0]
+        data = read_json_cached(results_json_path)
+        n_spin, n_k, n_eig = result_array_shape(data['eigenvalues'], base_dir=os.path.dirname(results_json_path))
         # Add spin, k-points, and eigenvalues to results
         selected_results.update(
             {
@@ -104,12 +112,12 @@ def extract_selected_results(
     except IOError:
         logging.error(f"An IO error occurred while reading the file {results_json_path}.")
     # Write results to the output JSON file
-    Path(output_json_path).write_text(json.dumps(selected_results))
+    write_json_atomic(output_json_path, selected_results)
 
 
 # Example usage
 if __name__ == "__main__":
-    setup_logging()
+    setup_logging("runner.log")
     extract_selected_results(
         results_json_path=CALC_RESULT_JSON,
         siesta_out_path=SIESTA_OUT,
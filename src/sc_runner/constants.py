@@ -1,10 +1,13 @@
 # config.py
 """."""
-REQUEST_INTERVAL = 20  # Time interval for monitoring in seconds
-LOG_FILE = "project_executor.log"
-backend_url = "https://back.compmat.es/tasks_rq/fetch-results"
+import os
+
+# Settings that can differ between deployments may be overridden from the environment
+REQUEST_INTERVAL = int(os.getenv('REQUEST_INTERVAL', 20))  # Time interval for monitoring in seconds
+LOG_FILE = "runner.log"  # The runner and the update sender have always logged here
+backend_url = os.getenv('BACKEND_URL', "https://back.compmat.es/tasks_rq/fetch-results")
 output_file_path = 'siesta.out'
-CALC_RESULT_JSON = 'results.json'
+CALC_RESULT_JSON = os.getenv('CALC_RESULT_JSON', 'results.json')
 SIESTA_OUT = 'siesta.out'
 GENERAL_INFO_JSON = 'general_info.json'
 POTENTIAL_GRID = 'ElectrostaticPotential.grid.nc'
@@ -0,0 +1,67 @@
+"""."""
+import atexit
+import logging
+import multiprocessing
+import threading
+import time
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
+from typing import Optional
+
+_listener: Optional[QueueListener] = None
+# Longest time, in seconds, a buffered record waits before it is written to the log file
+LOG_FLUSH_INTERVAL = 5.0
+
+
+def _flush_periodically(handler: logging.Handler, interval: float) -> None:
+    """Flushes the handler every `interval` seconds, so the log file can be followed."""
+    while True:
+        time.sleep(interval)
+        handler.flush()
+
+
+def setup_logging(log_file: str = "task_log.log", level: int = logging.INFO) -> QueueListener:
+    """Sets up the logging configuration.
+
+    Records are only enqueued by the calling code; a single listener thread owns the
+    file and stream handlers, so logging never blocks on disk I/O. The queue is shared
+    with forked child processes, which therefore log through the same listener. File
+    writes are buffered and flushed every 100 records, every few seconds, on errors,
+    and at exit.
+
+    Only the first call configures logging; later calls return the running listener, so
+    every entry point can call this without replacing the handlers of another.
+
+    Args:
+        log_file (str): The file to which logs will be written.
+        level (int): The logging level.
+
+    Returns:
+        QueueListener: The started listener, stopped automatically at exit.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    # The file is only created once the first record is written
+    file_handler = logging.FileHandler(log_file, delay=True)
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+    # Batch file writes; errors and process exit flush the buffer immediately, and a
+    # background thread flushes it periodically so the file keeps up during long runs
+    buffered_file_handler = MemoryHandler(100, flushLevel=logging.ERROR, target=file_handler, flushOnClose=True)
+    threading.Thread(
+        target=_flush_periodically, args=(buffered_file_handler, LOG_FLUSH_INTERVAL), name="log_flush", daemon=True
+    ).start()
+
+    log_queue = multiprocessing.Queue(-1)
+    _listener = QueueListener(log_queue, buffered_file_handler, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    # The listener's handlers do the formatting; the queue only carries the message
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter())
+    logging.basicConfig(level=level, handlers=[queue_handler], force=True)
+    return _listener
@@ -1,20 +1,51 @@
 """."""
+import functools
 import logging
 import os
-import time
+import threading
+from sc_runner import constants
 from sc_runner.signal_sender import send_update
 from sc_runner.constants import REQUEST_INTERVAL
 
-def monitor_job(output_file_path: str, project_id: int, token: str, backend_url: str):
+def _get_mtime(file_path: str) -> float:
     """
-    Monitors the job status and file changes, sending updates when changes are detected.
+    Returns the modification time of a file, or 0 if it does not exist yet.
+    """
+    try:
+        return os.stat(file_path).st_mtime
+    except FileNotFoundError:
+        return 0
+
+def _mark_sent(update, update_sent):
+    """
+    Sets `update_sent` once a queued update has been accepted by the backend.
     """
-    initial_mod_time = os.path.getmtime(output_file_path) if os.path.exists(output_file_path) else 0
+    if update.result():
+        update_sent.set()
 
-    while True:
-        if os.path.exists(output_file_path) and os.path.getmtime(output_file_path) > initial_mod_time:
-            send_update(project_id, status='ruuning', token=token, backend_url=backend_url)
-            initial_mod_time = os.path.getmtime(output_file_path)
-            logging.info(f"File modified for project {project_id}, update sent.")
+def monitor_job(
+    project_id: int,
+    token: str,
+    stop_event=None,
+    update_sent=None,
+    output_file_path: str = constants.output_file_path,
+    backend_url: str = constants.backend_url,
+):
+    """
+    Monitors the job status and file changes, sending updates when changes are detected.
+    Polls until `stop_event` is set, or forever if no event is given, and sets
+    `update_sent` whenever the backend accepts an update. The watched file and the
+    backend default to the values in `sc_runner.constants`.
+    """
+    if stop_event is None:
+        stop_event = threading.Event()
+    initial_mod_time = _get_mtime(output_file_path)
 
-        time.sleep(REQUEST_INTERVAL)
+    while not stop_event.wait(REQUEST_INTERVAL):
+        mod_time = _get_mtime(output_file_path)
+        if mod_time > initial_mod_time:
+            update = send_update(project_id, status='ruuning', token=token, backend_url=backend_url)
+            if update_sent is not None:
+                update.add_done_callback(functools.partial(_mark_sent, update_sent=update_sent))
+            initial_mod_time = mod_time
+            logging.info(f"File modified for project {project_id}, update queued.")
@@ -1,29 +1,165 @@
 import os
+
+# Environment configuration
+# Limit threaded math libraries to the CPUs allocated to the job, before numpy or SIESTA
+# start their thread pools, so they do not oversubscribe the node's cores
+SLURM_CPUS_PER_TASK = os.environ.get('SLURM_CPUS_PER_TASK')
+for _thread_env in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'NUMEXPR_NUM_THREADS'):
+    os.environ.setdefault(_thread_env, SLURM_CPUS_PER_TASK or '1')
+if SLURM_CPUS_PER_TASK:
+    os.environ.setdefault('ASE_SIESTA_COMMAND',
+                          f'srun --cpus-per-task={SLURM_CPUS_PER_TASK} siesta < PREFIX.fdf > PREFIX.out')
+
 import logging
+import numpy as np
 from ase import Atoms
 from ase.calculators.siesta import Siesta
-from ase.io import jsonio
+from ase.io import jsonio, ulm
 from ase.io.trajectory import Trajectory
+from sc_runner.constants import CALC_RESULT_JSON
+from sc_runner.logging_setup import setup_logging
 from sc_runner.types import ProjectType
-from ase.optimize import BFGS
+from sc_runner.utils import read_json_cached, write_json_atomic
+from ase.optimize import BFGS, BFGSLineSearch, FIRE, LBFGS
 from ase.constraints import FixAtoms
-from ase.filters import FrechetCellFilter
-
-# Environment configuration
-#os.environ['ASE_SIESTA_COMMAND'] = 'srun siesta < PREFIX.fdf > PREFIX.out'
-logging.basicConfig(filename='runner.log', level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+from ase.filters import FrechetCellFilter, UnitCellFilter
+from ase.neighborlist import natural_cutoffs, neighbor_list
 
 # Constants
 ATOMS_JSON = 'atomic_struct.json'
 CALC_JSON = 'calculator.json'
 PARAMETERS_JSON = 'parameters.json'
-RESULTS_FILE = 'results.json'
+RESULTS_FILE = CALC_RESULT_JSON
+# Result arrays with more elements than this are stored in a binary ULM file next to the
+# results JSON, which only keeps a reference to them
+RESULTS_ULM = 'results.ulm'
+LARGE_ARRAY_SIZE = 1000
+# Calculator settings used when calculator.json leaves them out
+CALC_DEFAULTS = {
+    'pseudo_path': '.',
+    'xc': 'GGA',
+    'xcAuth': 'PBE',
+    'spin': 'none',
+    'energy_shift': 0.1,
+    'basisSet': 'DZP',
+    'meshCutoff': 300,
+    'nkx': 1,
+    'nky': 1,
+    'nkz': 1,
+    'MixingCoeff': 0.3,
+    'maxIter': 50,
+}
+
+
+class CheckpointMixin:
+    """
+    Writes the optimizer restart file every `checkpoint_every` steps instead of every step.
+
+    ASE rewrites the restart file in place at each step, so an interrupted write leaves a
+    file that cannot be decoded on restart. Here the state is written to a temporary file
+    that atomically replaces the restart file, and the latest state is always written
+    when the run ends.
+
+    When a cell filter is optimized, its reference cell is stored with the state and put
+    back on restart, since the restored state describes cell deformations relative to it.
+    """
+
+    checkpoint_every = 5
+
+    def dump(self, data):
+        if isinstance(self.atoms, UnitCellFilter):
+            data = {'optimizer': data, 'orig_cell': np.asarray(self.atoms.orig_cell)}
+        self._checkpoint = data
+        self._n_dumps = getattr(self, '_n_dumps', 0) + 1
+        if self._n_dumps % self.checkpoint_every == 0:
+            self.write_checkpoint()
+
+    def write_checkpoint(self):
+        data = getattr(self, '_checkpoint', None)
+        if data is None or self.restart is None or self.comm.rank != 0:
+            return
+        tmp_path = f'{self.restart}.tmp'
+        with open(tmp_path, 'w') as fd:
+            jsonio.write_json(fd, data)
+        os.replace(tmp_path, self.restart)
+        self._checkpoint = None
+
+    def load(self):
+        data = super().load()
+        if isinstance(data, dict) and 'orig_cell' in data:
+            self.atoms.orig_cell = np.asarray(data['orig_cell'])
+            data = data['optimizer']
+        return data
+
+    def run(self, *args, **kwargs):
+        try:
+            return super().run(*args, **kwargs)
+        finally:
+            self.write_checkpoint()
+
+
+def checkpointed(optimizer_class):
+    """
+    Returns a subclass of an ASE optimizer that writes its restart file through `CheckpointMixin`.
+    """
+    return type(optimizer_class.__name__, (CheckpointMixin, optimizer_class), {})
+
+
+class DampedBFGS(BFGS):
+    """
+    BFGS with Powell damping of the Hessian update.
+
+    Noisy forces from a loosely converged SCF can give a step with negative curvature,
+    which makes the standard update indefinite and sends the next step uphill. The
+    damped update mixes in the current Hessian so it always stays positive definite.
+    """
+
+    def update(self, pos, forces, pos0, forces0):
+        if self.H is None:
+            self.H = self.H0
+            return
+        dpos = pos - pos0
+
+        if np.abs(dpos).max() < 1e-7:
+            # Same configuration again (maybe a restart):
+            return
+
+        # Change of the gradient, which is minus the force
+        dgrad = forces0 - forces
+        hdpos = np.dot(self.H, dpos)
+        curvature = np.dot(dpos, hdpos)
+        sy = np.dot(dpos, dgrad)
+        if sy < 0.2 * curvature:
+            theta = 0.8 * curvature / (curvature - sy)
+            dgrad = theta * dgrad + (1 - theta) * hdpos
+            sy = np.dot(dpos, dgrad)
+        self.H += np.outer(dgrad, dgrad) / sy - np.outer(hdpos, hdpos) / curvature
+
+
+# Optimizers selectable through optInputs['optimizer']
+# BFGSLineSearch only accepts steps that satisfy the Wolfe conditions, which guards
+# against uphill steps when the forces are noisy
+OPTIMIZERS = {
+    name: checkpointed(optimizer_class)
+    for name, optimizer_class in (
+        ('lbfgs', LBFGS), ('fire', FIRE), ('bfgs', DampedBFGS), ('bfgslinesearch', BFGSLineSearch)
+    )
+}
+DEFAULT_OPTIMIZER = 'lbfgs'
+# Optimizer state, reused when a relaxation is restarted
+OPTIMIZER_RESTART = '{}_restart.json'
+# Bond angles with cos below -LINEAR_ANGLE_COS are treated as linear
+LINEAR_ANGLE_COS = 0.999
+LINEAR_ANGLE_DISPLACEMENT = 1e-3  # Å
 
 
 def load_json_data(file_path):
     """
     Loads JSON data from the given file path.
 
+    The parsed data is cached until the file changes and is shared between callers,
+    so it must not be modified.
+
     Args:
         file_path (str): Path to the JSON file.
 
@@ -31,7 +167,7 @@ def load_json_data(file_path):
         dict: Loaded JSON data if successful, None otherwise.
     """
     try:
-        return jsonio.read_json(file_path)
+        return read_json_cached(file_path, parser=jsonio.read_json)
     except FileNotFoundError:
         logging.error(f"File not found: {file_path}")
     except Exception as e:
@@ -39,6 +175,46 @@ def load_json_data(file_path):
     return None
 
 
+def build_fdf_arguments(calc_dict, parameters_dict):
+    """
+    Builds the extra FDF arguments for Siesta from the calculator and parameters inputs.
+
+    Args:
+        calc_dict (dict): Calculator settings, merged with CALC_DEFAULTS.
+        parameters_dict (dict): Requested analyses and their inputs.
+
+    Returns:
+        dict: FDF keywords and blocks to pass to the calculator.
+    """
+    fdf_arguments = {
+        'DM.MixingWeight': calc_dict['MixingCoeff'],
+        'MaxSCFIterations': calc_dict['maxIter'],
+        'DM.UseSaveDM': True,
+    }
+
+    if parameters_dict.get('dosWanted'):
+        dos_inputs = parameters_dict['dosInputs']
+        pdosblock = "\n%block ProjectedDensityOfStates\n" \
+                    "{:8.4f} {:8.4f} {:8.4f} 3220 {}\n" \
+                    "%endblock ProjectedDensityOfStates".format(
+                        *map(float, (dos_inputs['enemin'], dos_inputs['enemax'], dos_inputs['fwhm'])),
+                        dos_inputs['selectedunit'],
+                    )
+        fdf_arguments['PDOSBLOCK'] = pdosblock
+
+    if parameters_dict.get('chargeWanted'):
+        charge_inputs = parameters_dict['chargeInputs']
+        charges_args = {
+            'WriteMullikenPop': int(charge_inputs.get('mullikenWanted', 0)),
+            'WriteHirshfeldPop': charge_inputs.get('hirshfeldWanted', False),
+            'WriteVoronoiPop': charge_inputs.get('voronoiWanted', False),
+            'saverho': True,
+        }
+        fdf_arguments.update(charges_args)
+
+    return fdf_arguments
+
+
 def configure_calculator():
     """
     Configures and returns an ASE Atoms object with an attached Siesta calculator.
@@ -52,7 +228,10 @@ def configure_calculator():
         return None
 
     try:
-        if atom_object.pbc.any:
+        if atom_object.pbc.any():
+            if atom_object.cell.volume <= 0.0:
+                logging.error("Periodic structure has a cell with zero volume.")
+                return None
             logging.info('System is periodic.')
         else:
             atom_object.center(vacuum=8.0)
@@ -66,50 +245,25 @@ def configure_calculator():
     if not calc_dict or not parameters_dict:
         logging.error("Error loading calculator or parameters JSON.")
         return None
+    calc_dict = {**CALC_DEFAULTS, **calc_dict}
 
     try:
         # Initialize Siesta calculator
         calc = Siesta()
-        calc.parameters['pseudo_path'] = calc_dict.get('pseudo_path', '.')
-        calc.parameters['xc'] = (calc_dict.get('xc'), calc_dict.get('xcAuth'))
-        calc.parameters['spin'] = calc_dict.get('spin', 'none')
-        calc.parameters['energy_shift'] = calc_dict.get('energy_shift', 0.1)
-        calc.parameters['basis_set'] = calc_dict.get('basisSet', 'DZP')
-        calc.parameters['mesh_cutoff'] = calc_dict.get('meshCutoff', 300)
-        calc.parameters['kpts'] = [int(calc_dict.get(key, 1)) for key in ['nkx', 'nky', 'nkz']]
-
-        # Configure FDF arguments
-        fdf_arguments = {
-            'DM.MixingWeight': calc_dict.get('MixingCoeff', 0.3),
-            'MaxSCFIterations': calc_dict.get('maxIter', 50),
-            'DM.UseSaveDM': True,
-        }
+        calc.parameters['pseudo_path'] = calc_dict['pseudo_path']
+        calc.parameters['xc'] = (calc_dict['xc'], calc_dict['xcAuth'])
+        calc.parameters['spin'] = calc_dict['spin']
+        calc.parameters['energy_shift'] = calc_dict['energy_shift']
+        calc.parameters['basis_set'] = calc_dict['basisSet']
+        calc.parameters['mesh_cutoff'] = calc_dict['meshCutoff']
+        calc.parameters['kpts'] = [int(calc_dict[key]) for key in ('nkx', 'nky', 'nkz')]
 
         if parameters_dict.get('bandWanted'):
             nk = int(parameters_dict['bandInputs']['nkforband'])
-            lattice = atom_object.get_cell()
-            band_path = lattice.bandpath(npoints=nk)
+            band_path = atom_object.cell.bandpath(npoints=nk)
             calc.parameters['bandpath'] = band_path
 
-        if parameters_dict.get('dosWanted'):
-            dos_inputs = parameters_dict['dosInputs']
-            pdosblock = f"\n%block ProjectedDensityOfStates\n" \
-                        f"{float(dos_inputs['enemin']):8.4f} {float(dos_inputs['enemax']):8.4f} " \
-                        f"{float(dos_inputs['fwhm']):8.4f} 3220 {dos_inputs['selectedunit']}\n" \
-                        "%endblock ProjectedDensityOfStates"
-            fdf_arguments['PDOSBLOCK'] = pdosblock
-
-        if parameters_dict.get('chargeWanted'):
-            charge_inputs = parameters_dict['chargeInputs']
-            charges_args = {
-                'WriteMullikenPop': int(charge_inputs.get('mullikenWanted', 0)),
-                'WriteHirshfeldPop': charge_inputs.get('hirshfeldWanted', False),
-                'WriteVoronoiPop': charge_inputs.get('voronoiWanted', False),
-                'saverho': True,
-            }
-            fdf_arguments.update(charges_args)
-
-        calc.parameters['fdf_arguments'] = fdf_arguments
+        calc.parameters['fdf_arguments'] = build_fdf_arguments(calc_dict, parameters_dict)
         atom_object.calc = calc
         logging.info("Calculator configured successfully.")
         return atom_object
@@ -130,19 +284,9 @@ def run_calculation(project_type):
     if atoms:
         logging.info("Starting calculation.")
         try:
-            if project_type == ProjectType.GEOMETRY_OPTIMIZATION:
-                run_geometry_optimization(atoms)
-            elif project_type == ProjectType.MD:
-                # Example: Molecular dynamics setup (custom logic might apply)
-                traj = Trajectory('md_simulation.traj', 'w', atoms)
-                # Add MD implementation here
-                traj.close()
-                logging.info("Molecular dynamics simulation completed successfully.")
-
-            else:
-                # Single-point calculation
-                atoms.get_potential_energy()
-                logging.info("Single-point calculation completed successfully.")
+            # Project types without a dedicated runner get a single-point calculation
+            runner = CALCULATION_RUNNERS.get(project_type, run_single_point)
+            runner(atoms, load_json_data(PARAMETERS_JSON))
 
             # Save final results
             full_results = atoms.calc.results
@@ -153,39 +297,197 @@ def run_calculation(project_type):
         logging.error("Calculation could not start due to an error in configuration.")
 
 
-def run_geometry_optimization(atoms):
-    """Run geometry optimization with logging and constraints."""
-    parameters_dict = load_json_data(PARAMETERS_JSON)
-    fixed_atoms = parameters_dict['optInputs']['atomInds']
-    cell_const = parameters_dict['optInputs']['cellConstraints']
-    traj = Trajectory('geometry_optimization.traj', 'w', atoms)
-    if fixed_atoms:
+def run_single_point(atoms, parameters_dict):
+    """Run a single-point calculation.
+
+    Args:
+        atoms (Atoms): Atoms object with the Siesta calculator attached.
+        parameters_dict (dict): Parsed parameters; unused.
+    """
+    atoms.get_potential_energy()
+    logging.info("Single-point calculation completed successfully.")
+
+
+def run_md(atoms, parameters_dict):
+    """Run a molecular dynamics simulation.
+
+    Args:
+        atoms (Atoms): Atoms object with the Siesta calculator attached.
+        parameters_dict (dict): Parsed parameters.
+    """
+    # Example: Molecular dynamics setup (custom logic might apply)
+    traj = Trajectory('md_simulation.traj', 'w', atoms)
+    # Add MD implementation here
+    traj.close()
+    logging.info("Molecular dynamics simulation completed successfully.")
+
+
+def run_geometry_optimization(atoms, parameters_dict):
+    """Run geometry optimization with logging and constraints.
+
+    Args:
+        atoms (Atoms): Atoms object with the Siesta calculator attached.
+        parameters_dict (dict): Parsed parameters, including the 'optInputs' settings.
+    """
+    # Index and mask arrays let ASE apply the constraints with vectorized indexing
+    fixed_atoms = np.asarray(parameters_dict['optInputs']['atomInds'] or [], dtype=int)
+    cell_const = np.asarray(parameters_dict['optInputs']['cellConstraints'] or [], dtype=bool)
+    optimizer_name = str(parameters_dict['optInputs'].get('optimizer', DEFAULT_OPTIMIZER)).lower()
+    if optimizer_name not in OPTIMIZERS:
+        logging.warning(f"Unknown optimizer '{optimizer_name}', using {DEFAULT_OPTIMIZER}.")
+        optimizer_name = DEFAULT_OPTIMIZER
+    optimizer_class = OPTIMIZERS[optimizer_name]
+    restart_file = OPTIMIZER_RESTART.format(optimizer_name)
+    if os.path.exists(restart_file):
+        logging.info(f"Restarting {optimizer_name} from {restart_file}.")
+    # Store only what the analysis reads, plus the stress when the cell is relaxed; all
+    # of these are already computed at every step
+    properties = ['energy', 'forces', 'stress'] if cell_const.size else ['energy', 'forces']
+    traj = Trajectory('geometry_optimization.traj', 'w', atoms, properties=properties)
+    if fixed_atoms.size:
         c = FixAtoms(indices=fixed_atoms)
         atoms.set_constraint(c)
         logging.info("\nFixed atoms constraint added to optimizer\n")
-    if cell_const:
+    if cell_const.size:
         fc = FrechetCellFilter(atoms, mask=cell_const)
-        optimizer = BFGS(fc, trajectory=traj, logfile='optimization.log')
+        target = fc
         logging.info("\nFixed cell constraint added to optimizer\n")
     else:
-        optimizer = BFGS(atoms, trajectory=traj, logfile='optimization.log')
+        target = atoms
+    linear_angles = find_linear_angles(atoms)
+    if linear_angles:
+        logging.warning(f"Found {len(linear_angles)} near-linear bond angles, e.g. atoms {linear_angles[0]}; "
+                        "a symmetric linear arrangement can leave the optimizer stuck on a saddle point.")
+        if parameters_dict['optInputs'].get('perturbLinearAngles'):
+            perturb_linear_angles(atoms, linear_angles)
+            logging.info("Displaced the central atoms of near-linear angles.")
+    coarse_stage = parameters_dict['optInputs'].get('coarseStage')
+    if coarse_stage:
+        run_coarse_stage(atoms, target, optimizer_class, restart_file, coarse_stage)
+    optimizer = optimizer_class(target, trajectory=traj, logfile='optimization.log', restart=restart_file)
+    logging.info(f"Using {optimizer_class.__name__} optimizer.")
     optimizer.run(fmax=0.02)
     traj.close()
     logging.info("Geometry optimization completed successfully.")
 
 
+def find_linear_angles(atoms):
+    """Find two-coordinated atoms whose bond angle is close to 180 degrees.
+
+    Only atoms with exactly two bonds are considered, as in CO2 or acetylene; opposite
+    neighbors of highly coordinated atoms in crystals are collinear by symmetry.
+
+    Args:
+        atoms (Atoms): The structure; bonds follow ASE's natural cutoffs.
+
+    Returns:
+        list: (first, center, last) atom index triplets.
+    """
+    first, second, vectors = neighbor_list('ijD', atoms, natural_cutoffs(atoms))
+    unit_vectors = vectors / np.linalg.norm(vectors, axis=1)[:, None]
+    # Neighbor pairs are sorted by their first index, i.e. the central atom
+    centers, starts, n_bonds = np.unique(first, return_index=True, return_counts=True)
+    two_bonded = n_bonds == 2
+    centers, starts = centers[two_bonded], starts[two_bonded]
+    cosines = np.einsum('ij,ij->i', unit_vectors[starts], unit_vectors[starts + 1])
+    linear = cosines < -LINEAR_ANGLE_COS
+    return [
+        (int(second[start]), int(center), int(second[start + 1]))
+        for center, start in zip(centers[linear], starts[linear])
+    ]
+
+
+def perturb_linear_angles(atoms, linear_angles):
+    """Displace the central atom of each linear angle perpendicular to its bond axis.
+
+    Args:
+        atoms (Atoms): The structure; fixed atoms stay in place.
+        linear_angles (list): Triplets returned by `find_linear_angles`.
+    """
+    positions = atoms.get_positions()
+    for first, center, _ in linear_angles:
+        axis = atoms.get_distance(center, first, mic=True, vector=True)
+        if not np.linalg.norm(axis):
+            # The atom is bonded to its own periodic images
+            continue
+        axis /= np.linalg.norm(axis)
+        helper = np.eye(3)[0] if abs(axis[0]) < 0.9 else np.eye(3)[1]
+        normal = np.cross(axis, helper)
+        positions[center] += LINEAR_ANGLE_DISPLACEMENT * normal / np.linalg.norm(normal)
+    atoms.set_positions(positions)
+
+
+def run_coarse_stage(atoms, target, optimizer_class, restart_file, coarse_inputs):
+    """Pre-relax with cheaper Siesta settings before the tight optimization.
+
+    The mesh cutoff is halved and the energy shift doubled, unless 'meshCutoff' or
+    'energyShift' are given, and the structure is relaxed to 'fmax' (0.1 eV/Å by default).
+    The optimizer state carries over to the tight stage through the restart file, and
+    the density matrix through DM.UseSaveDM.
+
+    Args:
+        atoms (Atoms): Atoms object with the Siesta calculator attached.
+        target (Atoms or FrechetCellFilter): The object being optimized.
+        optimizer_class (type): The ASE optimizer used for both stages.
+        restart_file (str): The optimizer restart file shared with the tight stage.
+        coarse_inputs (dict or bool): The 'coarseStage' settings, or True for the defaults.
+    """
+    coarse_inputs = coarse_inputs if isinstance(coarse_inputs, dict) else {}
+    calc = atoms.calc
+    tight_parameters = {key: calc.parameters[key] for key in ('mesh_cutoff', 'energy_shift')}
+    calc.parameters['mesh_cutoff'] = coarse_inputs.get('meshCutoff', tight_parameters['mesh_cutoff'] / 2)
+    calc.parameters['energy_shift'] = coarse_inputs.get('energyShift', tight_parameters['energy_shift'] * 2)
+    calc.reset()
+    logging.info(f"Starting coarse stage with mesh cutoff {calc.parameters['mesh_cutoff']} "
+                 f"and energy shift {calc.parameters['energy_shift']}.")
+    try:
+        optimizer = optimizer_class(target, logfile='optimization_coarse.log', restart=restart_file)
+        optimizer.run(fmax=coarse_inputs.get('fmax', 0.1))
+    finally:
+        calc.parameters.update(tight_parameters)
+        calc.reset()
+    logging.info("Coarse stage completed.")
+
+
 def save_results_to_json(results, output_file):
-    """Filters and saves selected results to JSON using ASE's jsonio.
+    """Filters and saves selected results to JSON in ASE's jsonio format.
 
     Args:
         results (dict): Results dictionary from the Siesta calculation.
         output_file (str): Path to the output JSON file.
     """
 
-    jsonio.write_json(output_file, results)
+    # Arrays are kept as they are; only results that were not computed are left out
+    filtered_results = {key: value for key, value in results.items() if value is not None}
+    large_arrays = {
+        key: value for key, value in filtered_results.items()
+        if isinstance(value, np.ndarray) and value.size > LARGE_ARRAY_SIZE
+    }
+    if large_arrays:
+        ulm_file = os.path.join(os.path.dirname(output_file), RESULTS_ULM)
+        with ulm.open(f'{ulm_file}.tmp', 'w') as writer:
+            writer.write(**large_arrays)
+        os.replace(f'{ulm_file}.tmp', ulm_file)
+        filtered_results.update({key: {'ulm': RESULTS_ULM, 'key': key} for key in large_arrays})
+    write_json_atomic(output_file, filtered_results, cls=jsonio.MyEncoder)
     logging.info(f"Results saved to {output_file}")
 
 
+# Calculation run for each project type
+CALCULATION_RUNNERS = {
+    ProjectType.SINGLE_POINT: run_single_point,
+    ProjectType.MD: run_md,
+    ProjectType.GEOMETRY_OPTIMIZATION: run_geometry_optimization,
+}
+
+
 if __name__ == "__main__":
-    run_calculation()
+    setup_logging('runner.log')
+    # Standalone runs take the project type from the environment
+    try:
+        project_type = ProjectType(os.environ.get('SC_PROJECT_TYPE', 'single_point').lower())
+    except ValueError:
+        logging.error("Invalid SC_PROJECT_TYPE. Defaulting to 'single_point'.")
+        project_type = ProjectType.SINGLE_POINT
+    run_calculation(project_type)
 
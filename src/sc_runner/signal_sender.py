@@ -1,21 +1,41 @@
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+
 import requests
 
-# Configure logging to write to runner.log in the same directory
-logging.basicConfig(
-    filename="runner.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+# One keep-alive connection to the backend is reused for every update, and a single
+# worker posts the updates in the order they were sent without blocking the caller.
+# Pending updates are still posted when the interpreter exits.
+_session = requests.Session()
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="send_update")
+# Seconds to wait for the connection and for the response
+REQUEST_TIMEOUT = (3, 10)
+
+
+def _post_update(project_id: int, url: str, headers: dict, data: dict) -> bool:
+    """Posts a status update and reports whether the backend accepted it."""
+    try:
+        response = _session.post(url, headers=headers, json=data, verify=False, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        logging.info(f"Successfully sent update for project {project_id} "
+                     f"with status {response.status_code}, response json is :  {response.json()}")
+        return True
+    except requests.RequestException as e:
+        logging.error(f"Error sending update for project {project_id}: {e}")
+        return False
+
 
-def send_update(project_id: int, status: str, token: str, backend_url: str) -> None:
-    """Sends an update to the backend server with the project status.
+def send_update(project_id: int, status: str, token: str, backend_url: str) -> Future:
+    """Sends an update to the backend server with the project status in the background.
 
     Args:
         project_id (int): Project ID for identification.
         status (str): Status message or any other data to update.
         token (str): Authentication token.
         backend_url (str): Backend URL to send the data to.
+
+    Returns:
+        Future: Resolves to True if the backend accepted the update, False otherwise.
     """
     logging.info(f">>>>>>>>>>>>>>>>>>>>>> \n Sending update for project {project_id} with status: {status}\n")
     url = f"{backend_url}/{project_id}/"
@@ -27,12 +47,4 @@ def send_update(project_id: int, status: str, token: str, backend_url: str) -> N
         "status": status
     }
 
-    try:
-        response = requests.post(url, headers=headers, json=data, verify=False)
-        response.raise_for_status()
-        logging.info(f"Successfully sent update for project {project_id} "
-                     f"with status {response.status_code}, response json is :  {response.json()}")
-    except requests.RequestException as e:
-        logging.error(f"Error sending update for project {project_id}: {e}")
-
-
+    return _executor.submit(_post_update, project_id, url, headers, data)
@@ -1,6 +1,12 @@
 # utils.py
 import json
 import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from ase.io import ulm
 
 def load_json(file_path: str) -> dict:
     """
@@ -10,8 +16,8 @@ def load_json(file_path: str) -> dict:
         file_path (str): Path to the JSON file.
     """
     try:
-        with open(file_path, 'r') as file:
-            data = json.load(file)
+        # Parsing the raw bytes skips the text-mode file wrapper and its decode pass
+        data = json.loads(Path(file_path).read_bytes())
         logging.info(f"Loaded JSON data from {file_path}")
         return data
     except FileNotFoundError:
@@ -20,3 +26,79 @@ def load_json(file_path: str) -> dict:
     except json.JSONDecodeError:
         logging.error(f"Error decoding JSON from {file_path}.")
         raise
+
+
+def _parse_json(file_path: str):
+    """
+    Parses a JSON file with the standard library decoder.
+    """
+    return json.loads(Path(file_path).read_bytes())
+
+
+@lru_cache(maxsize=8)
+def _read_json(file_path: str, mtime_ns: int, parser):
+    """
+    Parses a JSON file once per modification time and parser.
+    """
+    return parser(file_path)
+
+
+def read_json_cached(file_path: str, parser=_parse_json):
+    """
+    Loads a JSON file, reusing the parsed data while the file is unchanged.
+
+    Several tasks read the same input and results files; only the first call parses them.
+    The returned object is shared between callers and must not be modified.
+
+    Args:
+        file_path (str): Path to the JSON file.
+        parser (callable): Function that parses the file at the given path, e.g.
+            `ase.io.jsonio.read_json` to decode ASE objects.
+    """
+    return _read_json(file_path, os.stat(file_path).st_mtime_ns, parser)
+
+
+def ndarray_from_json(entry) -> np.ndarray:
+    """
+    Decodes an array stored in ASE's `__ndarray__` JSON format.
+
+    Args:
+        entry (dict): The JSON value, `{"__ndarray__": [shape, dtype, flat_data]}`.
+    """
+    shape, dtype, flat_data = entry['__ndarray__']
+    return np.asarray(flat_data, dtype=dtype).reshape(shape)
+
+
+def result_array_shape(entry, base_dir: str = '.') -> tuple:
+    """
+    Returns the shape of an array stored in the results JSON without reading its data.
+
+    Small arrays are inlined in ASE's `__ndarray__` format; large ones are stored in a
+    ULM file next to the JSON and referenced as `{"ulm": file_name, "key": name}`.
+
+    Args:
+        entry (dict): The JSON value of the result.
+        base_dir (str): Directory of the results JSON, which also holds the ULM file.
+    """
+    if 'ulm' in entry:
+        with ulm.open(os.path.join(base_dir, entry['ulm'])) as reader:
+            return reader.proxy(entry['key']).shape
+    return tuple(entry['__ndarray__'][0])
+
+
+def write_json_atomic(file_path: str, data, **kwargs) -> None:
+    """
+    Writes data as JSON to a temporary file that then atomically replaces the target,
+    so readers never see a partially written file.
+
+    Pass no `indent`: without indentation `json` serializes the whole document with its
+    C encoder, which matters for the large arrays in the results.
+
+    Args:
+        file_path (str): Path to the JSON file.
+        data: JSON-serializable data.
+        kwargs: Extra keyword arguments for `json.dumps`.
+    """
+    tmp_path = f"{file_path}.tmp"
+    Path(tmp_path).write_text(json.dumps(data, **kwargs))
+    os.replace(tmp_path, file_path)
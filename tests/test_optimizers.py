@@ -0,0 +1,102 @@
+"""Tests for the checkpointing optimizers in sc_runner.runner."""
+import numpy as np
+import pytest
+from ase import Atoms
+from ase.build import bulk
+from ase.calculators.emt import EMT
+from ase.io import jsonio
+from ase.optimize import BFGS
+
+from sc_runner.runner import OPTIMIZERS, DampedBFGS
+
+
+class Interrupted(Exception):
+    pass
+
+
+class InterruptingEMT(EMT):
+    """EMT calculator that fails after a given number of calculations."""
+
+    def __init__(self, calculations):
+        super().__init__()
+        self.calculations = calculations
+
+    def calculate(self, *args, **kwargs):
+        if self.calculations == 0:
+            raise Interrupted
+        self.calculations -= 1
+        super().calculate(*args, **kwargs)
+
+
+class RecordingOptimizer(OPTIMIZERS['bfgs']):
+    """Records after how many steps the restart file is written."""
+
+    def __init__(self, *args, **kwargs):
+        self.writes = []
+        super().__init__(*args, **kwargs)
+
+    def write_checkpoint(self):
+        if getattr(self, '_checkpoint', None) is not None:
+            self.writes.append(self._n_dumps)
+        super().write_checkpoint()
+
+
+def rattled_copper():
+    atoms = bulk('Cu', cubic=True) * 2
+    atoms.rattle(0.1, seed=3)
+    atoms.calc = EMT()
+    return atoms
+
+
+def hessians_after_update(optimizer_class, hessian, pos):
+    """Hessian estimate after a step to `pos` on a quadratic energy with the given Hessian."""
+    optimizer = optimizer_class(Atoms('H2', positions=[[0, 0, 0], [0, 0, 1]]), logfile=None)
+    pos0 = np.zeros(6)
+    optimizer.update(pos0, -hessian @ pos0, None, None)
+    optimizer.update(pos, -hessian @ pos, pos0, -hessian @ pos0)
+    return optimizer.H
+
+
+def test_damped_bfgs_matches_bfgs_without_damping():
+    # Curvature close to the initial guess (alpha = 70) needs no damping
+    hessian = np.diag([60.0, 65.0, 70.0, 75.0, 80.0, 85.0])
+    pos = np.linspace(0.01, 0.06, 6)
+    np.testing.assert_allclose(hessians_after_update(DampedBFGS, hessian, pos),
+                               hessians_after_update(BFGS, hessian, pos))
+
+
+def test_damped_bfgs_stays_positive_definite():
+    # Negative curvature along the step makes the plain BFGS update indefinite
+    hessian = np.diag([-20.0, 65.0, 70.0, 75.0, 80.0, 85.0])
+    pos = np.array([0.05, 0.01, 0.0, 0.0, 0.0, 0.0])
+    assert np.linalg.eigvalsh(hessians_after_update(BFGS, hessian, pos)).min() < 0
+    assert np.linalg.eigvalsh(hessians_after_update(DampedBFGS, hessian, pos)).min() > 0
+
+
+def test_restart_file_written_every_five_steps_and_on_exit(tmp_path):
+    restart_file = tmp_path / 'bfgs_restart.json'
+    optimizer = RecordingOptimizer(rattled_copper(), restart=str(restart_file), logfile=None)
+    optimizer.run(fmax=1e-9, steps=12)
+
+    assert optimizer.writes == [5, 10, 12]
+    H, pos0, forces0, maxstep = jsonio.read_json(str(restart_file), always_array=False)
+    np.testing.assert_allclose(H, optimizer.H)
+    np.testing.assert_allclose(pos0, optimizer.pos0)
+
+
+def test_interrupted_run_resumes_from_restart_file(tmp_path):
+    restart_file = str(tmp_path / 'bfgs_restart.json')
+    reference = rattled_copper()
+    OPTIMIZERS['bfgs'](reference, logfile=None).run(fmax=1e-9, steps=12)
+
+    atoms = rattled_copper()
+    atoms.calc = InterruptingEMT(8)
+    interrupted = OPTIMIZERS['bfgs'](atoms, restart=restart_file, logfile=None)
+    with pytest.raises(Interrupted):
+        interrupted.run(fmax=1e-9, steps=12)
+
+    atoms.calc = EMT()
+    resumed = OPTIMIZERS['bfgs'](atoms, restart=restart_file, logfile=None)
+    np.testing.assert_allclose(resumed.H, interrupted.H)
+    resumed.run(fmax=1e-9, steps=12 - interrupted.nsteps)
+    np.testing.assert_allclose(atoms.positions, reference.positions, atol=1e-10)